@@ -3,14 +3,21 @@ from dataclasses import dataclass
 import time
 from contextlib import asynccontextmanager
 
-@dataclass
+@dataclass(slots=True)
 class Elapsed:
-    elapsed: float | None = None
+    elapsed_ns: int | None = None
+
+    @property
+    def elapsed(self) -> float | None:
+        """Elapsed time in seconds."""
+        if self.elapsed_ns is None:
+            return None
+        return self.elapsed_ns / 1e9
 
 @asynccontextmanager
 async def timer():
     e = Elapsed()
-    t = time.perf_counter()
+    t = time.perf_counter_ns()
     yield e
-    e.elapsed = time.perf_counter() - t
+    e.elapsed_ns = time.perf_counter_ns() - t
 # ~/~ end
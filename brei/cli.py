@@ -1,47 +1,48 @@
 # ~/~ begin <<docs/implementation.md#brei/cli.py>>[init]
-from argparse import ArgumentParser
+from argparse import ArgumentParser, HelpFormatter
 from pathlib import Path
 import re
 import sys
 import textwrap
-import tomllib
 from typing import Optional, Any
 import argh  # type: ignore
 import asyncio
-from rich.console import Console
 
-from rich_argparse import RichHelpFormatter
-from rich.table import Table
-
-from .runner import DEFAULT_RUNNERS
 from .errors import HelpfulUserError, UserError
 from .lazy import Phony
-from .utility import construct, read_from_file
+from .utility import read_from_file
 from .program import Program, resolve_tasks
+from .task import Task
 from .logging import logger, configure_logger
 from .version import __version__
 from .result import Result
 
 log = logger()
 
+_INPUT_FILE_RE = re.compile(r"([^\[\]]+)\[([^\[\]\s]+)\]")
+
 
 async def main(
     program: Program, target_strs: list[str], force_run: bool, throttle: Optional[int]
-):
+) -> Result[Any]:
     db = await resolve_tasks(program, history_path=Path(".brei_history"))
     if throttle:
         db.throttle = asyncio.Semaphore(throttle)
     db.force_run = force_run
 
+    # A single root task requiring all targets, so that the dependency graph
+    # is walked once, even if targets share dependencies. The root is not
+    # added to the database, so it has no name a user could refer to.
+    root = Task([], [Phony.intern(t) for t in target_strs])
+
     with db.persistent_history():
-        results: list[Result[Any]] = await asyncio.gather(*(db.run(Phony(t), db=db) for t in target_strs))
+        result: Result[Any] = await root.run_cached(db.run, {}, db=db)
 
-    if not all(results):
+    if not result:
         log.error("Some jobs have failed:")
-        for r in results:
-            if not r:
-                msg = textwrap.indent(str(r), "| ")
-                log.error(msg)
+        msg = textwrap.indent(str(result), "| ")
+        log.error(msg)
+    return result
 
 
 @argh.arg("targets", nargs="*", help="names of tasks to run")
@@ -72,6 +73,11 @@ def brei(
         sys.exit(0)
 
     if list_runners:
+        # Imported here, so that other invocations don't load all of `rich`.
+        from rich.console import Console
+        from rich.table import Table
+        from .runner import DEFAULT_RUNNERS
+
         t = Table(title="Default Runners", header_style="italic green", show_edge=False)
         t.add_column("runner", style="bold yellow")
         t.add_column("executable")
@@ -83,7 +89,7 @@ def brei(
         sys.exit(0)
 
     if input_file is not None:
-        if m := re.match(r"([^\[\]]+)\[([^\[\]\s]+)\]", input_file):
+        if m := _INPUT_FILE_RE.match(input_file):
             input_path = Path(m.group(1))
             section = m.group(2)
         else:
@@ -96,19 +102,14 @@ def brei(
         program = read_from_file(Program, Path("brei.toml"))
 
     elif Path("pyproject.toml").exists():
-        with open("pyproject.toml", "rb") as f_in:
-            data = tomllib.load(f_in)
         try:
-            for s in ["tool", "brei"]:
-                data = data[s]
-        except KeyError as e:
+            program = read_from_file(Program, Path("pyproject.toml"), "tool.brei")
+        except HelpfulUserError as e:
             raise HelpfulUserError(
                 f"With out the `-f` argument, Brei looks for `brei.toml` first, then for "
                 f"a `[tool.brei]` section in `pyproject.toml`. A `pyproject.toml` file was "
                 f"found, but contained no `[tool.brei]` section."
             ) from e
-
-        program = construct(Program, data)
     else:
         raise HelpfulUserError(
             "No input file given, no `loom.toml` found and no `pyproject.toml` found."
@@ -117,13 +118,23 @@ def brei(
     jobs = int(jobs) if jobs else None
     configure_logger(debug)
     try:
-        asyncio.run(main(program, targets, force_run, jobs))
+        result = asyncio.run(main(program, targets, force_run, jobs))
     except UserError as e:
         log.error(f"Failed: {e}")
+        sys.exit(1)
+
+    if not result:
+        sys.exit(1)
+
+
+def _rich_help_formatter(prog: str) -> HelpFormatter:
+    # `rich_argparse` is only imported when help or usage is printed.
+    from rich_argparse import RichHelpFormatter
+    return RichHelpFormatter(prog)
 
 
 def cli():
-    parser = ArgumentParser(formatter_class=RichHelpFormatter)
+    parser = ArgumentParser(formatter_class=_rich_help_formatter)
     argh.set_default_command(parser, brei)
     argh.dispatch(parser)
 
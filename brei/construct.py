@@ -1,7 +1,9 @@
 # ~/~ begin <<docs/utility.md#brei/construct.py>>[init]
+import functools
 import typing
-from typing import Any, Self, Union, TypeVar, TypeGuard, Type, Optional, cast
+from typing import Any, Callable, Self, Union, TypeVar, TypeGuard, Type, Optional
 import types
+import os
 
 import tomllib
 import json
@@ -20,16 +22,15 @@ def isgeneric(annot):
 
 
 class FromStr:
+    __slots__ = ()
+
     @classmethod
     def from_str(cls, _: str) -> Self:
         raise NotImplementedError()
 
 
 def construct(annot: Any, json: Any) -> Any:
-    try:
-        return _construct(annot, json)
-    except (AssertionError, ValueError) as e:
-        raise InputError(annot, json) from e
+    return _constructor(annot)(json)
 
 
 def is_object_type(dtype: Type[Any]) -> TypeGuard[Type[dict[str, Any]]]:
@@ -48,64 +49,172 @@ def is_optional_type(dtype: Type[Any]) -> TypeGuard[Type[Optional[Any]]]:
     )
 
 
-def _construct(annot: Type[T], json: Any) -> T:
-    """Construct an object from a given type from a JSON stream.
+@functools.lru_cache(maxsize=None)
+def _constructor(annot: Any) -> Callable[[Any], Any]:
+    """Same as `_compile`, but translates errors into `InputError`."""
+    f = _compile(annot)
+
+    def construct_checked(json: Any) -> Any:
+        try:
+            return f(json)
+        except (AssertionError, ValueError) as e:
+            raise InputError(annot, json) from e
+
+    return construct_checked
+
+
+def _type_checker(annot: type) -> Callable[[Any], Any]:
+    def check(json: Any) -> Any:
+        assert isinstance(json, annot)
+        return json
 
-    The `annot` type should be one of: str, int, list[T], Optional[T],
-    or a dataclass, and the JSON data should match exactly the given
-    definitions in the dataclass hierarchy.
+    return check
+
+
+@functools.lru_cache(maxsize=None)
+def _compile(annot: Any) -> Callable[[Any], Any]:
+    """Compile a constructor for the type `annot`. All introspection on
+    `annot` happens here, once per type, so that the returned function only
+    has to deal with the JSON data.
     """
-    if annot is bool:
-        assert isinstance(json, bool)
-        return cast(T, json)
-    if annot is str:
-        assert isinstance(json, str)
-        return cast(T, json)
-    if annot is int:
-        assert isinstance(json, int)
-        return cast(T, json)
+    if annot is bool or annot is str or annot is int:
+        return _type_checker(annot)
+
     if is_object_type(annot):
-        assert isinstance(json, dict)
-        return cast(
-            T, {k: construct(typing.get_args(annot)[1], v) for k, v in json.items()}
-        )
+        value = _constructor(typing.get_args(annot)[1])
+
+        def construct_object(json: Any) -> Any:
+            assert isinstance(json, dict)
+            return {k: value(v) for k, v in json.items()}
+
+        return construct_object
+
     if annot is Any:
-        return cast(T, json)
+        return lambda json: json
+
     # if annot is dict or isgeneric(annot) and typing.get_origin(annot) is dict:
     #    assert isinstance(json, dict)
     #    return json
-    if annot is Path and isinstance(json, str):
-        return cast(T, Path(json))
+    if annot is Path:
+        def construct_path(json: Any) -> Any:
+            if not isinstance(json, str):
+                raise ValueError(f"Couldn't construct {annot} from {repr(json)}")
+            return Path(json)
+
+        return construct_path
+
     if isgeneric(annot) and typing.get_origin(annot) is list:
-        assert isinstance(json, list)
-        return cast(T, [construct(typing.get_args(annot)[0], item) for item in json])
+        item = _constructor(typing.get_args(annot)[0])
+
+        def construct_list(json: Any) -> Any:
+            assert isinstance(json, list)
+            return [item(x) for x in json]
+
+        return construct_list
+
     if is_optional_type(annot):
-        if json is None:
-            return cast(T, None)
-        else:
-            return cast(T, construct(typing.get_args(annot)[0], json))
+        some = _constructor(typing.get_args(annot)[0])
+        return lambda json: None if json is None else some(json)
+
     if isgeneric(annot) and typing.get_origin(annot) is types.UnionType:
-        for dtype in typing.get_args(annot):
-            try:
-                return cast(T, _construct(dtype, json))
-            except ValueError:
-                continue
-            except AssertionError:
-                continue
-        raise ValueError("None of the choices in type union match data.")
-    if type(annot) is type and issubclass(annot, FromStr) and isinstance(json, str):
-        return cast(T, annot.from_str(json))
+        choices = [
+            (_json_types(dtype), _compile(dtype)) for dtype in typing.get_args(annot)
+        ]
+
+        def construct_union(json: Any) -> Any:
+            for accepts, choice in choices:
+                if accepts is not None and not isinstance(json, accepts):
+                    continue
+                try:
+                    return choice(json)
+                except ValueError:
+                    continue
+                except AssertionError:
+                    continue
+            raise ValueError("None of the choices in type union match data.")
+
+        return construct_union
+
+    from_str = type(annot) is type and issubclass(annot, FromStr)
+    record = _dataclass_constructor(annot) if is_dataclass(annot) else None
+    options = (
+        {opt.name.lower(): opt for opt in annot}
+        if isinstance(annot, type) and issubclass(annot, Enum)
+        else None
+    )
+
+    def construct_other(json: Any) -> Any:
+        if from_str and isinstance(json, str):
+            return annot.from_str(json)
+        if record is not None:
+            return record(json)
+        if options is not None and isinstance(json, str):
+            assert json.lower() in options
+            return options[json.lower()]
+        raise ValueError(f"Couldn't construct {annot} from {repr(json)}")
+
+    return construct_other
+
+
+def _json_types(annot: Any) -> tuple[type, ...] | None:
+    """The JSON types that `annot` can be constructed from, or `None` if that
+    is not known up front. Used to skip union arms that can't match."""
+    if annot is bool or annot is str:
+        return (annot,)
+    if annot is int:
+        return (int, bool)
+    if annot is Path:
+        return (str,)
+    if isgeneric(annot) and typing.get_origin(annot) is list:
+        return (list,)
+    if is_object_type(annot):
+        return (dict,)
+    if isinstance(annot, type) and issubclass(annot, FromStr):
+        return None
     if is_dataclass(annot):
+        return (dict,)
+    if isinstance(annot, type) and issubclass(annot, Enum):
+        return (str,)
+    return None
+
+
+def _dataclass_constructor(annot: Any) -> Callable[[Any], Any]:
+    arg_annot = typing.get_type_hints(annot)
+    # Field constructors are compiled on first use, so that dataclasses may
+    # refer to themselves.
+    args: dict[str, Callable[[Any], Any]] = {}
+
+    def construct_dataclass(json: Any) -> Any:
         assert isinstance(json, dict)
-        arg_annot = typing.get_type_hints(annot)
+        if not args:
+            args.update((k, _constructor(t)) for k, t in arg_annot.items())
         # assert all(k in json for k in arg_annot)
-        args = {k: construct(arg_annot[k], json[k]) for k in json}
-        return cast(T, annot(**args))
-    if isinstance(json, str) and isinstance(annot, type) and issubclass(annot, Enum):
-        options = {opt.name.lower(): opt for opt in annot}
-        assert json.lower() in options
-        return cast(T, options[json.lower()])
-    raise ValueError(f"Couldn't construct {annot} from {repr(json)}")
+        return annot(**{k: args[k](v) for k, v in json.items()})
+
+    return construct_dataclass
+
+
+_file_cache: dict[str, tuple[int, int, Any]] = {}
+
+
+def _load_file(path: Path) -> Any:
+    """Decode a TOML or JSON file. The decoded data is cached per absolute
+    path, together with the modification time and size it was read at, so
+    that a file that is read more than once is parsed only once, and a new
+    version replaces the old one. The data is never modified by
+    `construct`, so it is safe to share."""
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        key = os.path.abspath(path)
+        cached = _file_cache.get(key)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+        if path.suffix == ".toml":
+            data = tomllib.load(f)
+        else:
+            data = json.load(f)
+        _file_cache[key] = (st.st_mtime_ns, st.st_size, data)
+        return data
 
 
 def read_from_file(data_type: Type[T], path: Path, section: Optional[str] = None) -> T:
@@ -120,15 +229,12 @@ def read_from_file(data_type: Type[T], path: Path, section: Optional[str] = None
     read_from_file(Config, Path("./pyproject.toml"), "tool.loom")
     ```
     """
-    if not path.exists():
-        raise HelpfulUserError(f"File not found: {path}")
-    with open(path, "rb") as f:
-        if path.suffix == ".toml":
-            data: Any = tomllib.load(f)
-        elif path.suffix == ".json":
-            data = json.load(f)
-        else:
-            raise HelpfulUserError(f"Unrecognized file format: {path}")
+    if path.suffix not in (".toml", ".json"):
+        raise HelpfulUserError(f"Unrecognized file format: {path}")
+    try:
+        data = _load_file(path)
+    except FileNotFoundError as e:
+        raise HelpfulUserError(f"File not found: {path}") from e
 
     try:
         if section is not None:
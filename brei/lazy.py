@@ -1,9 +1,9 @@
 # ~/~ begin <<docs/lazy.md#brei/lazy.py>>[init]
 from __future__ import annotations
-from copy import copy
 from dataclasses import dataclass, field, fields
 from typing import Generic, Iterable, Optional, Self, TypeVar, cast, Any
 import asyncio
+from weakref import WeakValueDictionary
 
 from .errors import CyclicWorkflowError, HelpfulUserError
 from .utility import FromStr
@@ -16,21 +16,38 @@ R = TypeVar("R")
 log = logger()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class Phony(FromStr):
     name: str
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_hash", hash(f"#{self.name}"))
+
+    @staticmethod
+    def intern(name: str) -> Phony:
+        """Returns a shared `Phony` instance for `name`. Equal targets that are
+        also identical make for faster dictionary lookups."""
+        try:
+            return _phonies[name]
+        except KeyError:
+            p = _phonies[name] = Phony(name)
+            return p
 
     @classmethod
     def from_str(cls, s: str) -> Phony:
         if s[0] == "#":
-            return Phony(s[1:])
+            return Phony.intern(s[1:])
         raise ValueError("A phony target should start with a `#` character.")
 
     def __str__(self):
         return f"#{self.name}"
 
     def __hash__(self):
-        return hash(str(self))
+        return self._hash
+
+
+_phonies: WeakValueDictionary[str, Phony] = WeakValueDictionary()
 
 
 @dataclass
@@ -53,7 +70,7 @@ class Lazy(Generic[T, R]):
     creates: list[T]
     requires: list[T]
 
-    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False)
+    _lock: Optional[asyncio.Lock] = field(default=None, init=False)
     _result: Optional[Result[R]] = field(default=None, init=False)
 
     @property
@@ -78,19 +95,27 @@ class Lazy(Generic[T, R]):
         raise NotImplementedError()
 
     async def run_after_deps(self, recurse, visited: dict[T, None], **kwargs) -> Result[R]:
-        dep_res = await asyncio.gather(
-            *(recurse(dep, copy(visited), **kwargs) for dep in self.requires)
-        )
-        if not all(dep_res):
-            return DependencyFailure(
-                {k: v for (k, v) in zip(self.requires, dep_res) if not v}
+        if self.requires:
+            deps = list(dict.fromkeys(self.requires))
+            dep_res = await asyncio.gather(
+                *(recurse(dep, visited, **kwargs) for dep in deps)
             )
+            if not all(dep_res):
+                return DependencyFailure(
+                    {k: v for (k, v) in zip(deps, dep_res) if not v}
+                )
         try:
             return Ok(await self.run(**kwargs))
         except TaskFailure as f:
             return f
 
     async def run_cached(self, recurse, visited: dict[T, None], **kwargs) -> Result[R]:
+        if self._result is not None:
+            return self._result
+        # The lock is only needed once someone actually runs the task; no
+        # other coroutine can get in between the check and the assignment.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
         async with self._lock:
             if self._result is not None:
                 return self._result
@@ -118,10 +143,12 @@ class LazyDB(Generic[T, TaskT]):
     index: dict[T, TaskT] = field(default_factory=dict)
 
     async def run(self, t: T, visited: dict[T, None] | None = None, **kwargs) -> Result[Any]:
+        """Run the task that creates `t`. The `visited` argument holds the
+        chain of targets leading up to `t` and is never modified, so it can
+        be shared between sibling dependencies."""
         visited = visited or dict()
         if t in visited:
             raise CyclicWorkflowError(list(visited.keys()))
-        visited[t] = None
 
         if t not in self.index:
             try:
@@ -132,7 +159,11 @@ class LazyDB(Generic[T, TaskT]):
             task = self.index[t]
 
         while True:
-            match (result := await task.run_cached(self.run, visited, **kwargs)):
+            if task._result is not None:
+                result = task._result
+            else:
+                result = await task.run_cached(self.run, {**visited, t: None}, **kwargs)
+            match result:
                 case Ok(x) if isinstance(x, Lazy):
                     task = cast(TaskT, x)
                 case _:
@@ -1,17 +1,19 @@
 # ~/~ begin <<docs/implementation.md#brei/logging.py>>[init]
 import logging
 import sys
-from rich.highlighter import RegexHighlighter
-from rich.logging import RichHandler
 
 def logger():
     return logging.getLogger("brei")
 
 def configure_logger(debug: bool, rich: bool = True):
-    class BackTickHighlighter(RegexHighlighter):
-        highlights = [r"`(?P<bold>[^`]*)`"]
-
     if rich:
+        # Imported here, so that importing Brei doesn't load all of `rich`.
+        from rich.highlighter import RegexHighlighter
+        from rich.logging import RichHandler
+
+        class BackTickHighlighter(RegexHighlighter):
+            highlights = [r"`(?P<bold>[^`]*)`"]
+
         FORMAT = "%(message)s"
         logging.basicConfig(
             level=logging.DEBUG if debug else logging.INFO,
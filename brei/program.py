@@ -5,13 +5,14 @@ from copy import copy
 from itertools import chain, product, repeat
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import cached_property
 import json
 from pathlib import Path
+from typing import Iterable, cast
 
 import tomllib
 
 
-from .template_strings import gather_args
 from .logging import logger
 from .errors import HelpfulUserError, UserError
 
@@ -67,26 +68,25 @@ class TemplateCall:
     collect: str | None = None
     join: Join = Join.INNER
 
-    @property
-    def all_args(self):
+    @cached_property
+    def all_args(self) -> tuple[dict[str, str], ...]:
         if all(isinstance(v, str) for v in self.args.values()):
-            yield self.args
-            return
+            return (cast(dict[str, str], self.args),)
 
+        keys = self.args.keys()
+        values: Iterable[tuple[str, ...]]
         if self.join == Join.INNER:
-            for v in zip(
+            values = zip(
                 *map(
                     lambda x: repeat(x) if isinstance(x, str) else x,
                     self.args.values(),
                 )
-            ):
-                yield dict(zip(self.args.keys(), v))
-
+            )
         else:  # cartesian product
-            for v in product(
+            values = product(
                 *map(lambda x: [x] if isinstance(x, str) else x, self.args.values())
-            ):
-                yield dict(zip(self.args.keys(), v))
+            )
+        return tuple(dict(zip(keys, v)) for v in values)
 
 
 @dataclass
@@ -152,14 +152,15 @@ async def resolve_tasks(program: Program, history_path: Path | None = None) -> T
 
     async def go(program: Program):
         for var, template in program.environment.items():
-            db.add(TemplateVariable([Variable(var)], [], template))
+            db.add(TemplateVariable([Variable.intern(var)], [], template))
 
         task_templates = copy(program.task)
         template_index.update(program.template)
         delayed_calls: list[TemplateCall] = []
         delayed_templates: list[TaskProxy] = []
 
-        db.runners.update(program.runner)
+        if program.runner:
+            db.runners = {**db.runners, **program.runner}
 
         for c in program.call:
             if c.template not in template_index:
@@ -179,7 +180,7 @@ async def resolve_tasks(program: Program, history_path: Path | None = None) -> T
             # > resolvable after all other tasks were added, seeing that the
             # > task to resolve these variables can't have templated targets
             # > themselves.
-            if gather_args(tt.all_targets):
+            if tt.target_args:
                 delayed_templates.append(tt)
             else:
                 db.add(TemplateTask([], [], tt))
@@ -204,7 +205,7 @@ async def resolve_tasks(program: Program, history_path: Path | None = None) -> T
                 raise MissingTemplate(c.template)
 
             for tt in tasks_from_call(template_index[c.template], c):
-                if gather_args(tt.creates):
+                if tt.target_args:
                     delayed_templates.append(tt)
                 else:
                     db.add(TemplateTask([], [], tt))
@@ -35,13 +35,11 @@ class DependencyFailure(Failure, Generic[T]):
     def __str__(self):
         return "\n".join(f"{key} -> {fail}" for key, fail in self.dependencies.items())
 
-@dataclass
+@dataclass(slots=True)
 class Ok(Generic[R]):
+    # Truthy through the default object protocol, no `__bool__` needed.
     value: R
 
-    def __bool__(self):
-        return True
-
 
 Result = Failure | Ok[R]
 # ~/~ end
@@ -1,11 +1,22 @@
 # ~/~ begin <<docs/tasks.md#brei/runner.py>>[init]
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
+from string import Template
 
 
 @dataclass
 class Runner:
     command: str
     args: list[str]
+    _arg_templates: list[Template] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._arg_templates = [Template(arg) for arg in self.args]
+
+    def arguments(self, script: Path) -> list[str]:
+        """Arguments to `command`, with `${script}` substituted."""
+        script_str = str(script)
+        return [t.substitute(script=script_str) for t in self._arg_templates]
 
 
 DEFAULT_RUNNERS: dict[str, Runner] = {
@@ -5,20 +5,24 @@ from collections import defaultdict
 from contextlib import contextmanager, nullcontext
 from copy import copy
 from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
 from pathlib import Path
 import re
-import string
 import json
 from tempfile import NamedTemporaryFile
-from typing import Any, DefaultDict, Optional, TextIO
+from types import MappingProxyType
+from typing import Any, DefaultDict, Mapping, Optional, TextIO
 from asyncio import create_subprocess_exec
 from textwrap import indent
 import shlex
 import hashlib
+import logging
+import os
+from weakref import WeakValueDictionary
 
 from .result import TaskFailure
 from .lazy import MissingDependency, Lazy, LazyDB, Phony
-from .utility import stat
+from .utility import StatCache
 from .logging import logger
 from .template_strings import gather_args, substitute
 from .runner import Runner, DEFAULT_RUNNERS
@@ -26,23 +30,45 @@ from .runner import Runner, DEFAULT_RUNNERS
 
 log = logger()
 
+# Shared `extra` argument for log messages with rich markup.
+_MARKUP = {"markup": True}
+_VAR_RE = re.compile(r"var\(([^\s\(\)]+)\)")
+_DEFAULT_RUNNERS: Mapping[str, Runner] = MappingProxyType(DEFAULT_RUNNERS)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class Variable:
     name: str
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_hash", hash(f"var({self.name})"))
+
+    @staticmethod
+    def intern(name: str) -> Variable:
+        """Returns a shared `Variable` instance for `name`."""
+        try:
+            return _interned_variables[name]
+        except KeyError:
+            v = _interned_variables[name] = Variable(name)
+            return v
 
     def __hash__(self):
-        return hash(f"var({self.name})")
+        return self._hash
 
     def __str__(self):
         return f"var({self.name})"
 
 
+_interned_variables: WeakValueDictionary[str, Variable] = WeakValueDictionary()
+
+
+@lru_cache(maxsize=8192)
 def str_to_target(s: str) -> Path | Phony | Variable:
-    if s[0] == "#":
-        return Phony(s[1:])
-    elif m := re.match(r"var\(([^\s\(\)]+)\)", s):
-        return Variable(m.group(1))
+    if s.startswith("#"):
+        return Phony.intern(s[1:])
+    elif s.startswith("var(") and (m := _VAR_RE.match(s)):
+        return Variable.intern(m.group(1))
     else:
         return Path(s)
 
@@ -62,19 +88,25 @@ class Task(Lazy[Path | Phony | Variable, str | None]):
     description: Optional[str] = None
     force: bool = False
 
-    @property
-    def target_paths(self):
-        return (p for p in self.creates if isinstance(p, Path))
+    @cached_property
+    def target_paths(self) -> tuple[Path, ...]:
+        return tuple(p for p in self.creates if isinstance(p, Path))
 
-    @property
-    def dependency_paths(self):
-        return (p for p in self.requires if isinstance(p, Path))
+    @cached_property
+    def dependency_paths(self) -> tuple[Path, ...]:
+        return tuple(p for p in self.requires if isinstance(p, Path))
 
-    @property
+    @cached_property
+    def _argv_lines(self) -> list[list[str]]:
+        """The script tokenized for the default runner, one argv per line."""
+        assert self.script is not None
+        return [shlex.split(line) for line in self.script.splitlines()]
+
+    @cached_property
     def digest(self) -> str | None:
         if self.script is None:
             return None
-        return hashlib.md5(self.script.encode()).hexdigest()
+        return hashlib.md5(self.script.encode(), usedforsecurity=False).hexdigest()
 
     def __str__(self):
         tgts = ", ".join(str(t) for t in self.creates)
@@ -89,25 +121,29 @@ class Task(Lazy[Path | Phony | Variable, str | None]):
         return name + f"[{tgts}] <- [{deps}]\n" + src
 
     def __post_init__(self):
-        if self.name and Phony(self.name) not in self.creates:
+        creates = set(self.creates)
+        requires = set(self.requires)
+        if self.name and Phony(self.name) not in creates:
             self.creates.append(Phony(self.name))
-        if self.stdin and self.stdin not in self.requires:
+        if self.stdin and self.stdin not in requires:
             self.requires.append(self.stdin)
-        if self.path and self.path not in self.requires:
+            requires.add(self.stdin)
+        if self.path and self.path not in requires:
             self.requires.append(self.path)
-        if self.stdout and self.stdout not in self.creates:
+        if self.stdout and self.stdout not in creates:
             self.creates.append(self.stdout)
 
     def always_run(self) -> bool:
-        return self.force or len(list(self.target_paths)) == 0
+        return self.force or len(self.target_paths) == 0
 
     def needs_run(self, db: TaskDB) -> bool:
-        if any(not p.exists() for p in self.target_paths):
-            return True
-        target_stats = [stat(p) for p in self.target_paths]
-        dep_stats = [stat(p) for p in self.dependency_paths]
-        if any(t < d for t in target_stats for d in dep_stats):
+        if any(not db.stat_cache.exists(p) for p in self.target_paths):
             return True
+        if self.target_paths and self.dependency_paths:
+            oldest_target = min(db.stat_cache.stat(p) for p in self.target_paths)
+            newest_dep = max(db.stat_cache.stat(p) for p in self.dependency_paths)
+            if oldest_target < newest_dep:
+                return True
         if any(self.digest != db.history.get(p, None) for p in self.target_paths):
             return True
         return False
@@ -115,21 +151,15 @@ class Task(Lazy[Path | Phony | Variable, str | None]):
     @contextmanager
     def get_script_path(self):
         if self.path is not None:
-            tmpfile = None
-            path = self.path
+            yield self.path
         elif self.script is not None:
-            tmpfile = NamedTemporaryFile("w")
-            tmpfile.write(self.script)
-            tmpfile.flush()
-            path = Path(tmpfile.name)
+            with NamedTemporaryFile("w") as tmpfile:
+                tmpfile.write(self.script)
+                tmpfile.flush()
+                yield Path(tmpfile.name)
         else:
             raise ValueError("A `Rule` can have either `path` or `script` defined.")
 
-        yield path
-
-        if tmpfile is not None:
-            tmpfile.close()
-
     @contextmanager
     def get_stdout(self):
         match self.stdout:
@@ -155,7 +185,9 @@ class Task(Lazy[Path | Phony | Variable, str | None]):
         targets = " ".join(f"`{t}`" for t in self.creates)
         short_note = self.description or (f"#{self.name}" if self.name else None) \
             or f"creating {targets}"
-        log.info(f"[green]{short_note}[/]", extra={'markup': True})
+        log_info = log.isEnabledFor(logging.INFO)
+        if log_info:
+            log.info(f"[green]{short_note}[/]", extra=_MARKUP)
 
         stdin: TextIO | int | None = None
         match self.stdin:
@@ -174,27 +206,30 @@ class Task(Lazy[Path | Phony | Variable, str | None]):
                 assert self.stdin is None
 
 
-            with self.get_stdout() as stdout:
-                stdout_data = b""
-                for line in self.script.splitlines():
-                    async with db.throttle or nullcontext():
+            # The script counts as a single job, so the throttle is held for
+            # all lines together.
+            async with db.throttle or nullcontext():
+                with self.get_stdout() as stdout:
+                    stdout_parts: list[bytes] = []
+                    for argv in self._argv_lines:
                         proc = await create_subprocess_exec(
-                            *shlex.split(line),
+                            *argv,
                             stdin=stdin,
                             stdout=stdout,
                             stderr=asyncio.subprocess.PIPE,
                         )
                         stdout_data_part, stderr_data = await proc.communicate(input_data)
                         log.debug(f"return-code {proc.returncode}")
-                    if stdout_data_part:
-                        stdout_data += stdout_data_part
-                    if stderr_data:
-                        log.info(f"[gold1]{short_note}[/] %s", stderr_data.decode().rstrip(), extra={"markup": True})
+                        if stdout_data_part:
+                            stdout_parts.append(stdout_data_part)
+                        if stderr_data and log_info:
+                            log.info(f"[gold1]{short_note}[/] %s", stderr_data.decode().rstrip(), extra=_MARKUP)
+                    stdout_data = b"".join(stdout_parts)
 
         elif self.runner is not None:
             with self.get_script_path() as path, self.get_stdout() as stdout:
                 runner = db.runners[self.runner]
-                args = [string.Template(arg).substitute(script=path) for arg in runner.args]
+                args = runner.arguments(path)
                 async with db.throttle or nullcontext():
                     proc = await create_subprocess_exec(
                         runner.command,
@@ -206,12 +241,13 @@ class Task(Lazy[Path | Phony | Variable, str | None]):
                     stdout_data, stderr_data = await proc.communicate(input_data)
                     log.debug(f"return-code {proc.returncode}")
 
-            if stderr_data:
-                log.info(f"[gold1]{short_note}[/] %s", stderr_data.decode().rstrip(), extra={"markup": True})
+            if stderr_data and log_info:
+                log.info(f"[gold1]{short_note}[/] %s", stderr_data.decode().rstrip(), extra=_MARKUP)
 
         else:
             return
 
+        db.stat_cache.invalidate(self.target_paths)
         for p in self.target_paths:
             db.history[p] = self.digest
 
@@ -239,29 +275,39 @@ class TaskProxy:
     description: Optional[str] = None
     force: bool = False
 
-    @property
-    def all_targets(self):
+    @cached_property
+    def all_targets(self) -> list[str]:
         return (
             self.creates
             + ([self.stdout] if self.stdout else [])
             + ([f"#{self.name}"] if self.name else [])
         )
 
-    @property
-    def all_dependencies(self):
+    @cached_property
+    def all_dependencies(self) -> list[str]:
         return (
             self.requires
             + ([self.stdin] if self.stdin else [])
             + ([self.path] if self.path else [])
         )
 
+    @cached_property
+    def target_args(self) -> frozenset[str]:
+        """Template variables that appear in any of the targets."""
+        return gather_args(self.all_targets)
+
+    @cached_property
+    def template_args(self) -> frozenset[str]:
+        """Template variables that appear anywhere in the task."""
+        return gather_args(self)
+
 
 @dataclass
 class TemplateVariable(Lazy[Variable, str]):
     template: str
 
     def __post_init__(self):
-        self.requires += [Variable(arg) for arg in gather_args(self.template)]
+        self.requires += [Variable.intern(arg) for arg in gather_args(self.template)]
 
     async def run(self, *, db) -> str:
         return substitute(self.template, db.environment)
@@ -274,7 +320,7 @@ class TemplateTask(Lazy[Path | Phony | Variable, Task]):
     def __post_init__(self):
         assert not gather_args(self.template.creates)
         self.creates += [str_to_target(t) for t in self.template.all_targets]
-        self.requires += [Variable(arg) for arg in gather_args(self.template)]
+        self.requires += [Variable.intern(arg) for arg in self.template.template_args]
 
     async def run(self, *, db):
         proxy = substitute(self.template, db.environment)
@@ -301,11 +347,16 @@ class TemplateTask(Lazy[Path | Phony | Variable, Task]):
 
 @dataclass
 class TaskDB(LazyDB[Path | Variable | Phony, Task | TemplateTask | TemplateVariable]):
-    runners: dict[str, Runner] = field(default_factory=lambda: copy(DEFAULT_RUNNERS))
+    # Shared read-only view; `resolve_tasks` replaces it with a merged dict
+    # when a program configures its own runners.
+    runners: Mapping[str, Runner] = field(default_factory=lambda: _DEFAULT_RUNNERS)
     throttle: Optional[asyncio.Semaphore] = None
     force_run: bool = False
     history_path: Path | None = None
     history: dict[Path, str | None] = field(default_factory=dict)
+    stat_cache: StatCache = field(default_factory=StatCache)
+    _variables: dict[str, Task | TemplateTask | TemplateVariable] = field(
+        default_factory=dict, init=False, repr=False)
 
     @contextmanager
     def persistent_history(self):
@@ -313,33 +364,56 @@ class TaskDB(LazyDB[Path | Variable | Phony, Task | TemplateTask | TemplateVaria
             yield
         else:
             self.read_history(self.history_path)
+            before = copy(self.history)
             yield
-            self.write_history(self.history_path)
+            if self.history != before:
+                self.write_history(self.history_path)
 
     def read_history(self, history_path: Path):
-        if not history_path.exists():
+        try:
+            raw = history_path.read_bytes()
+        except FileNotFoundError:
+            return
+        if not raw.strip():
             return
 
-        with open(history_path, "r") as f_in:
-            data = json.load(f_in)
-            for k, v in data.items():
-                self.history[Path(k)] = v
+        for k, v in json.loads(raw).items():
+            self.history[Path(k)] = v
 
     def write_history(self, history_path: Path):
         with open(history_path, "w") as f_out:
             json.dump({str(k): v for k, v in self.history.items()}, f_out, indent=2)
 
+    def add(self, task: Task | TemplateTask | TemplateVariable):
+        super().add(task)
+        for target in task.creates:
+            if isinstance(target, Variable):
+                self._variables[target.name] = task
+
+    @property
+    def variables(self) -> Mapping[str, Task | TemplateTask | TemplateVariable]:
+        """Read-only view from variable names to the tasks that create them."""
+        return MappingProxyType(self._variables)
+
+    def clean(self):
+        super().clean()
+        self._variables = {}
+
+    def reset(self):
+        super().reset()
+        self.stat_cache.clear()
+
     def on_missing(self, t: Path | Phony | Variable):
         if isinstance(t, Path) and t.exists():
             return Task([t], [])
         raise MissingDependency()
 
     def is_resolvable(self, s: Any) -> bool:
-        return all(v in self.index for v in map(Variable, gather_args(s)))
+        return all(v in self._variables for v in gather_args(s))
 
     async def resolve_object(self, s: Any) -> Any:
         vars = gather_args(s)
-        await asyncio.gather(*(self.run(Variable(v), db=self) for v in vars))
+        await asyncio.gather(*(self.run(Variable.intern(v), db=self) for v in vars))
         result = substitute(s, self.environment)
         log.debug(f"substituting {s} => {result}")
         return result
@@ -354,13 +428,13 @@ class Environment:
         self.db = db
 
     def __contains__(self, k: str):
-        return Variable(k) in self.db.index
+        return k in self.db.variables
 
     def items(self):
-        return (k.name for k in self.db.index if isinstance(k, Variable))
+        return iter(self.db.variables)
 
     def __getitem__(self, k: str):
-        return self.db.index[Variable(k)].result
+        return self.db.variables[k].result
 
 
 class Template(TaskProxy):
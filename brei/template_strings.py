@@ -2,7 +2,7 @@
 from dataclasses import dataclass, is_dataclass, fields
 from string import Template
 from typing import Any, Generic, Mapping, TypeVar, cast
-from functools import singledispatch
+from functools import lru_cache, singledispatch
 
 
 from .lazy import Lazy
@@ -11,14 +11,53 @@ from .lazy import Lazy
 T = TypeVar("T")
 
 
+@lru_cache(maxsize=None)
+def _public_fields(dtype: type) -> tuple[str, ...]:
+    return tuple(f.name for f in fields(dtype) if f.name[0] != "_")
+
+
+@lru_cache(maxsize=8192)
+def _template(s: str) -> Template:
+    return Template(s)
+
+
+@lru_cache(maxsize=8192)
+def _identifiers(s: str) -> frozenset[str]:
+    return frozenset(_template(s).get_identifiers())
+
+
+@lru_cache(maxsize=8192)
+def _parts(s: str) -> tuple[tuple[str, str | None], ...]:
+    """Split `s` into `(text, name)` pairs, where `name` is `None` for
+    literal text. A placeholder keeps its original text, so that it can be
+    left in place when the variable is missing, as `safe_substitute` does."""
+    parts: list[tuple[str, str | None]] = []
+    literal = ""
+    pos = 0
+    for m in Template.pattern.finditer(s):
+        literal += s[pos:m.start()]
+        pos = m.end()
+        name = m.group("named") or m.group("braced")
+        if name is None:
+            literal += Template.delimiter if m.group("escaped") is not None else m.group()
+            continue
+        if literal:
+            parts.append((literal, None))
+            literal = ""
+        parts.append((m.group(), name))
+    literal += s[pos:]
+    if literal or not parts:
+        parts.append((literal, None))
+    return tuple(parts)
+
+
 @singledispatch
 def substitute(template, env: Mapping[str, str]):
     dtype = type(template)
     if is_dataclass(dtype):
         args = {
-            f.name: substitute(getattr(template, f.name), env)
-            for f in fields(dtype)
-            if f.name[0] != "_"
+            name: substitute(getattr(template, name), env)
+            for name in _public_fields(dtype)
         }
         return dtype(**args)
 
@@ -28,7 +67,18 @@ def substitute(template, env: Mapping[str, str]):
 
 @substitute.register
 def _(template: str, env: Mapping[str, str]) -> str:
-    return Template(template).safe_substitute(env)
+    parts = _parts(template)
+    if len(parts) == 1 and parts[0][1] is None:
+        return parts[0][0]
+    result = []
+    for text, name in parts:
+        if name is not None:
+            try:
+                text = str(env[name])
+            except KeyError:
+                pass
+        result.append(text)
+    return "".join(result)
 
 
 @substitute.register
@@ -41,31 +91,30 @@ def _(_template: None, _) -> None:
 
 
 @singledispatch
-def gather_args(template: Any) -> set[str]:
+def gather_args(template: Any) -> frozenset[str]:
     dtype = type(template)
     if is_dataclass(dtype):
         args = (
-            gather_args(getattr(template, f.name))
-            for f in fields(dtype)
-            if f.name[0] != "_"
+            gather_args(getattr(template, name))
+            for name in _public_fields(dtype)
         )
-        return set().union(*args)
+        return frozenset().union(*args)
 
-    return set()
+    return frozenset()
     # raise TypeError(f"Can't perform string substitution on object of type: {dtype}")
 
 
 @gather_args.register
-def _(template: str) -> set[str]:
-    return set(Template(template).get_identifiers())
+def _(template: str) -> frozenset[str]:
+    return _identifiers(template)
 
 
 @gather_args.register
-def _(template: list) -> set[str]:
-    return set().union(*map(gather_args, template))
+def _(template: list) -> frozenset[str]:
+    return frozenset().union(*map(gather_args, template))
 
 
 @gather_args.register
-def _(_template: None) -> set[str]:
-    return set()
+def _(_template: None) -> frozenset[str]:
+    return frozenset()
 # ~/~ end
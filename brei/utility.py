@@ -4,8 +4,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from pathlib import Path
+from typing import Iterable
 from datetime import datetime
 
+import errno
 import os
 
 from .construct import construct, FromStr, read_from_file 
@@ -15,21 +17,67 @@ def normal_relative(path: Path) -> Path:
     return path.resolve()  # .relative_to(Path.cwd())
 
 
-@dataclass
+@dataclass(slots=True)
 class FileStat:
     path: Path
-    modified: datetime
+    mtime_ns: int
 
     @staticmethod
     def from_path(path: Path):
         stat = os.stat(path)
-        return FileStat(path, datetime.fromtimestamp(stat.st_mtime))
+        return FileStat(path, stat.st_mtime_ns)
+
+    @property
+    def modified(self) -> datetime:
+        return datetime.fromtimestamp(self.mtime_ns / 1e9)
 
     def __lt__(self, other: FileStat) -> bool:
-        return self.modified < other.modified
+        return self.mtime_ns < other.mtime_ns
 
 
 def stat(path: Path) -> FileStat:
     path = normal_relative(path)
     return FileStat.from_path(path)
+
+
+# The errors for which `pathlib` says a path doesn't exist, instead of raising.
+_MISSING_ERRNOS = (errno.ENOENT, errno.ENOTDIR, errno.EBADF, errno.ELOOP)
+
+
+class StatCache:
+    """Memoizes file stats, so that every path is only stat'ed once during a
+    run. Entries need to be invalidated when a file is (re)written."""
+    def __init__(self):
+        self._stats: dict[Path, FileStat | None] = {}
+
+    def _lookup(self, path: Path) -> FileStat | None:
+        try:
+            return self._stats[path]
+        except KeyError:
+            pass
+        # `os.stat` follows symlinks by itself; resolving the path first would
+        # cost an extra `lstat` for every path component.
+        try:
+            result: FileStat | None = FileStat.from_path(path)
+        except OSError as e:
+            if e.errno not in _MISSING_ERRNOS:
+                raise
+            result = None
+        self._stats[path] = result
+        return result
+
+    def exists(self, path: Path) -> bool:
+        return self._lookup(path) is not None
+
+    def stat(self, path: Path) -> FileStat:
+        if (result := self._lookup(path)) is None:
+            raise FileNotFoundError(path)
+        return result
+
+    def invalidate(self, paths: Iterable[Path]):
+        for p in paths:
+            self._stats.pop(p, None)
+
+    def clear(self):
+        self._stats.clear()
 # ~/~ end
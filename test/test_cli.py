@@ -0,0 +1,60 @@
+import subprocess
+import sys
+from contextlib import chdir
+from pathlib import Path
+
+import pytest
+from brei.cli import main
+from brei.lazy import Phony
+from brei.program import Program
+from brei.result import DependencyFailure, TaskFailure
+from brei.utility import read_from_file
+
+
+def test_version_without_rich():
+    script = (
+        "import sys\n"
+        "sys.argv = ['brei', '--version']\n"
+        "from brei.cli import cli\n"
+        "try:\n"
+        "    cli()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "assert 'rich' not in sys.modules\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.startswith("Brei ")
+
+
+brei_toml = """
+[[task]]
+name = "good"
+runner = "bash"
+script = "echo good"
+
+[[task]]
+name = "bad"
+creates = ["never.txt"]
+runner = "bash"
+script = "true"
+"""
+
+
+@pytest.mark.asyncio
+async def test_failing_target(tmp_path):
+    with chdir(tmp_path):
+        Path("brei.toml").write_text(brei_toml)
+        program = read_from_file(Program, Path("brei.toml"))
+        result = await main(program, ["good", "bad"], False, None)
+        assert isinstance(result, DependencyFailure)
+        assert list(result.dependencies) == [Phony("bad")]
+        failure = result.dependencies[Phony("bad")]
+        assert isinstance(failure, TaskFailure)
+        assert failure.message == "Task didn't achieve goals."
+
+        proc = subprocess.run(
+            [sys.executable, "-c", "from brei.cli import cli; cli()", "good", "bad"],
+            capture_output=True, text=True)
+        assert proc.returncode == 1
+        assert "#bad -> Task didn't achieve goals." in proc.stdout
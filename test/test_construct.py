@@ -1,6 +1,11 @@
+import os
 from pathlib import Path
 from typing import Optional
+
+import pytest
+from brei.errors import InputError
 from brei.lazy import Phony
+from brei.program import Program
 from brei.utility import construct
 
 
@@ -9,3 +14,44 @@ def test_construct_path():
     assert construct(Optional[Path], None) is None
     assert isinstance(construct(Phony | Path, "hello.txt"), Path)
     assert isinstance(construct(Phony | Path, "#all"), Phony)
+
+
+def test_construct_union():
+    assert construct(str | list[str], "a") == "a"
+    assert construct(str | list[str], ["a", "b"]) == ["a", "b"]
+    assert construct(int | str, True) is True
+    with pytest.raises(InputError):
+        construct(str | list[str], 5)
+
+
+def test_construct_union_subclass():
+    class MyStr(str):
+        pass
+
+    assert construct(str | list[str], MyStr("a")) == "a"
+    assert construct(Phony | Path, MyStr("#all")) == Phony("all")
+
+
+def test_construct_error():
+    with pytest.raises(InputError) as e:
+        construct(Program, {"task": [{"creates": 5}]})
+    assert e.value.got == 5
+
+
+def test_read_from_file_changes(tmp_path):
+    src = tmp_path / "brei.toml"
+    src.write_text('include = ["a.toml"]\n')
+    first = Program.read(src)
+    assert first.include == ["a.toml"]
+    # changing a program doesn't change what the next read returns
+    first.include.append("x.toml")
+    assert Program.read(src).include == ["a.toml"]
+
+    src.write_text('include = ["a.toml", "b.toml"]\n')
+    assert Program.read(src).include == ["a.toml", "b.toml"]
+
+    # same size, only the modification time tells the versions apart
+    mtime = src.stat().st_mtime_ns
+    src.write_text('include = ["a.toml", "c.toml"]\n')
+    os.utime(src, ns=(mtime + 1_000_000, mtime + 1_000_000))
+    assert Program.read(src).include == ["a.toml", "c.toml"]
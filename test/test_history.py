@@ -74,3 +74,18 @@ async def test_history(tmp_path):
         assert s1 == s2
         assert s3 > s2
 
+
+
+@pytest.mark.asyncio
+async def test_history_unchanged(tmp_path):
+    with chdir(tmp_path):
+        prg1 = construct(Program, wf1)
+        db = await resolve_tasks(prg1, Path("brei_history"))
+        with db.persistent_history():
+            await db.run(Phony("all"), db=db)
+        h1 = Path("brei_history").stat().st_mtime_ns
+        await sleep(0.01)
+        db = await resolve_tasks(prg1, Path("brei_history"))
+        with db.persistent_history():
+            await db.run(Phony("all"), db=db)
+        assert Path("brei_history").stat().st_mtime_ns == h1
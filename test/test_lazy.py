@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from typing import Any
 from brei.errors import CyclicWorkflowError
 from brei.lazy import Lazy, LazyDB
-import uuid
+from itertools import count
 
 
 class PyFunc(Lazy[str, Any]):
@@ -32,16 +32,19 @@ class PyLiteral(Lazy[str, Any]):
         return self.value
 
 
+_ids = count()
+
+
 class PyTaskDB(LazyDB[str, Any]):
     def lazy(self, f):
         def delayed(*args):
-            target = uuid.uuid4().hex
+            target = f"t{next(_ids)}"
             deps = []
             for arg in args:
                 if isinstance(arg, Lazy):
                     deps.append(arg.creates[0])
                 else:
-                    dep = uuid.uuid4().hex
+                    dep = f"t{next(_ids)}"
                     self.add(PyLiteral(dep, arg))
                     deps.append(dep)
 
@@ -4,6 +4,7 @@ from contextlib import chdir
 from pathlib import Path
 from brei.utility import stat
 from brei.lazy import Phony
+from brei.result import TaskFailure
 from brei.task import TaskDB, Task
 from brei.async_timer import timer
 
@@ -51,6 +52,18 @@ async def test_hello_stdout(tmp_path: Path):
         assert tgt.read_text() == "Hello, World!\n"
 
 
+@pytest.mark.asyncio
+async def test_target_below_file(tmp_path: Path):
+    with chdir(tmp_path):
+        db = TaskDBTester()
+        Path("x.txt").write_text("")
+        tgt = Path("x.txt/y")
+        db.target(tgt, [], runner="bash", script="true\n")
+        result = await db.run(tgt, db=db)
+        assert isinstance(result, TaskFailure)
+        assert result.message == "Task didn't achieve goals."
+
+
 @pytest.mark.asyncio
 async def test_runtime(tmp_path: Path):
     with chdir(tmp_path):
@@ -1,6 +1,7 @@
 from contextlib import chdir
 from dataclasses import dataclass
 from pathlib import Path
+import os
 import sys
 import time
 
@@ -169,6 +170,37 @@ requires = ["#inner", "#outer"]
       ("prod-1-a", "1a"), ("prod-1-b", "1b"), ("prod-2-a", "2a"), ("prod-2-b", "2b")])
 
 
+delayed_template = LoomTest("""
+include = [
+    "generated_wf.toml"
+]
+
+[environment]
+name = "hello"
+
+[[task]]
+stdout = "generated_wf.toml"
+runner = "python"
+script = '''
+print(\"\"\"
+[template.echo]
+stdout = "$${stdout}"
+script = "echo '$${text}'"
+\"\"\")
+'''
+
+[[call]]
+template = "echo"
+  [call.args]
+  stdout = "${name}.txt"
+  text = "Hello, World"
+
+[[task]]
+name = "all"
+requires = ["hello.txt"]
+""", [("hello.txt", "Hello, World")])
+
+
 force_run = """
 [[task]]
 name = "forced"
@@ -208,7 +240,15 @@ async def test_forcing(tmp_path):
         assert not stat(p2) > s2
 
 
-@pytest.mark.parametrize("test", [hello_world, include, template, rot_13, templated_task, variable_stdout, array_call])
+def test_script_path():
+    task = Task([], [], script="echo 'Hello, World'")
+    with task.get_script_path() as path:
+        # runners may canonicalize the script path, so it should be a real file
+        assert Path(os.path.realpath(path)).read_text() == "echo 'Hello, World'"
+
+
+@pytest.mark.parametrize("test", [hello_world, include, template, rot_13, templated_task, variable_stdout, array_call,
+                                  delayed_template])
 @pytest.mark.asyncio
 async def test_loom(tmp_path, test):
     with chdir(tmp_path):
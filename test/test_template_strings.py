@@ -1,6 +1,7 @@
 # ~/~ begin <<docs/template_strings.md#test/test_template_strings.py>>[init]
 from dataclasses import dataclass
 from typing import Iterable, Optional
+from string import Template
 import pytest
 from brei.task import TemplateVariable, Variable
 from brei.template_strings import gather_args, substitute
@@ -36,6 +37,17 @@ async def test_template_string():
     assert env["z"] == "print('Hello, World!')"
 
 
+@pytest.mark.asyncio
+async def test_template_string_memoized():
+    env = Environment()
+    env["x"] = "Hello, ${y}!"
+    env["y"] = "World"
+    await env.run(Variable("x"), db=env)
+    env["y"] = "Universe"
+    await env.run(Variable("x"), db=env)
+    assert env["x"] == "Hello, World!"
+
+
 @dataclass
 class MyData:
     some_list: list[str]
@@ -54,4 +66,10 @@ def test_template_dtype():
     assert subst.some_list == ["foo bar", "bar foo bar"]
     assert subst.some_prop == "bar foo"
     assert subst.some_none is None
+
+
+def test_substitute_escapes():
+    env = {"x": "foo", "y": "bar"}
+    for s in ["", "plain", "$$x ${x} $y ${z} $", "${x}${y}", "$x.txt", "${ x}"]:
+        assert substitute(s, env) == Template(s).safe_substitute(env)
 # ~/~ end